@@ -3,37 +3,223 @@
 Interactive Congressional District Map Generator
 Creates mobile-first responsive maps with clickable county boundaries
 """
-import json
+import datetime
+import gzip
+import hashlib
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import jinja2
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+import numpy as np
+import pyproj
+import shapely
 import geopandas as gpd
 import folium
+from folium.plugins import Fullscreen, VectorGridProtobuf
 from pathlib import Path
 import click
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Simplification tolerances in meters - tuned so the dropped vertices are
+# invisible at the default zoom, with the focal district kept tighter
+COUNTY_SIMPLIFY_TOLERANCE = 200
+DISTRICT_SIMPLIFY_TOLERANCE = 50
+
+# Downloaded GeoJSON cache: repeat renders with unchanged URLs skip the
+# network entirely until the TTL lapses
+GEOJSON_CACHE_DIR = Path.home() / '.cache' / 'coffee' / 'geojson'
+GEOJSON_CACHE_TTL = 24 * 60 * 60  # seconds
+
+# Compile the index page template once at import; every render after the
+# first reuses the cached template AST
+INDEX_TEMPLATE = jinja2.Template(
+    (Path(__file__).parent / 'templates' / 'index.html').read_text()
+)
+
+# One pooled session shared by the concurrent downloads, so both Drive
+# fetches reuse a warm TCP/TLS connection instead of re-handshaking
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+# Layer styles are constant, so build each dict once instead of allocating
+# a fresh one per feature inside a style_function lambda
+DISTRICT_STYLE = {
+    'fillColor': '#ff6b6b',
+    'color': '#c92a2a',
+    'weight': 3,
+    'fillOpacity': 0.3,
+    'opacity': 0.8
+}
+COUNTY_STYLE = {
+    'fillColor': '#4dabf7',
+    'color': '#1971c2',
+    'weight': 2,
+    'fillOpacity': 0.1,
+    'opacity': 0.6
+}
+
+
+def district_style(_feature):
+    return DISTRICT_STYLE
+
+
+def county_style(_feature):
+    return COUNTY_STYLE
+
+
+def build_county_tiles(counties_gdf, output_dir, district_key):
+    """Precompute pbf vector tiles for the counties layer with tippecanoe.
+
+    Tiles land in a per-district directory (tiles/<district_key>) so batch
+    workers rendering different districts never touch each other's output.
+    Returns the tiles directory on success, or None when tippecanoe/mb-util
+    aren't installed - callers fall back to the inline GeoJSON layer.
+    """
+    if shutil.which('tippecanoe') is None or shutil.which('mb-util') is None:
+        logger.warning("tippecanoe/mb-util not found; falling back to inline GeoJSON counties")
+        return None
+
+    tiles_dir = output_dir / 'tiles' / district_key
+    with tempfile.TemporaryDirectory() as tmp:
+        geojson_path = Path(tmp) / 'counties.geojson'
+        mbtiles_path = Path(tmp) / 'counties.mbtiles'
+        counties_gdf.to_file(geojson_path, driver='GeoJSON')
+
+        subprocess.run(
+            ['tippecanoe', '-zg', '-o', str(mbtiles_path),
+             '--drop-densest-as-needed', str(geojson_path)],
+            check=True
+        )
+        tiles_dir.parent.mkdir(parents=True, exist_ok=True)
+        if tiles_dir.exists():
+            shutil.rmtree(tiles_dir)
+        subprocess.run(
+            ['mb-util', '--image_format=pbf', str(mbtiles_path), str(tiles_dir)],
+            check=True
+        )
+
+    logger.info(f"County vector tiles written to {tiles_dir}")
+    return tiles_dir
+
+
+def write_gzipped(path):
+    """Write a precompressed <name>.gz sibling for static-host delivery"""
+    path = Path(path)
+    with gzip.open(f"{path}.gz", 'wb', compresslevel=6) as f:
+        f.write(path.read_bytes())
+
+
+def layer_bounds(gdf):
+    """(minx, miny, maxx, maxy) from one vectorized shapely.bounds call"""
+    envelopes = shapely.bounds(gdf.geometry.values)
+    return (envelopes[:, 0].min(), envelopes[:, 1].min(),
+            envelopes[:, 2].max(), envelopes[:, 3].max())
+
+
+@lru_cache(maxsize=8)
+def albers_transformers(crs):
+    """Forward/inverse transformers between a layer CRS and CONUS Albers"""
+    return (pyproj.Transformer.from_crs(crs, 5070, always_xy=True),
+            pyproj.Transformer.from_crs(5070, crs, always_xy=True))
+
+
+def reproject_geometry(geoms, transformer):
+    """Reproject geometries by handing pyproj whole coordinate arrays"""
+    def batch_transform(coords):
+        xs, ys = transformer.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack([xs, ys])
+
+    return shapely.transform(geoms, batch_transform)
+
+
+def simplify_for_display(gdf, tolerance):
+    """Simplify geometries (tolerance in meters) before Folium serializes them"""
+    if gdf.crs is None:
+        gdf = gdf.set_crs(4326)
+    forward, inverse = albers_transformers(str(gdf.crs))
+
+    # Project to CONUS Albers so the tolerance is a real distance. The
+    # cached transformers feed PROJ flat numpy arrays, avoiding the
+    # per-feature transform path of a full to_crs round-trip.
+    out = gdf.copy()
+    projected = reproject_geometry(out.geometry.values, forward)
+    simplified = shapely.simplify(projected, tolerance, preserve_topology=True)
+    out['geometry'] = reproject_geometry(simplified, inverse)
+    return out
+
 @click.command()
 @click.option('--state', required=True, help='State code')
 @click.option('--district', required=True, help='District number')
 @click.option('--urls', required=True, help='JSON string with Google Drive URLs')
-def generate_map(state, district, urls):
+@click.option('--vector-tiles', is_flag=True, default=False,
+              help='Serve counties as tippecanoe vector tiles instead of inline GeoJSON')
+def generate_map(state, district, urls, vector_tiles):
     """Generate interactive congressional district map"""
     # Parse URLs
     try:
-        drive_urls = json.loads(urls)
-    except json.JSONDecodeError:
+        drive_urls = orjson.loads(urls)
+    except orjson.JSONDecodeError:
         logger.error("Invalid JSON format for URLs")
         return
 
+    _render_one(state, district, drive_urls, vector_tiles)
+
+
+@click.command()
+@click.option('--manifest', required=True, type=click.Path(exists=True),
+              help='JSON list of {state, district, urls} jobs')
+@click.option('--vector-tiles', is_flag=True, default=False,
+              help='Serve counties as tippecanoe vector tiles instead of inline GeoJSON')
+def generate_maps_batch(manifest, vector_tiles):
+    """Render every district in a manifest across all CPU cores.
+
+    Forked workers inherit the module imports, so the ~1s Python +
+    geopandas startup is paid once instead of once per district, and the
+    renders themselves run in parallel.
+    """
+    jobs = orjson.loads(Path(manifest).read_bytes())
+    args = [(job['state'], job['district'], job['urls'], vector_tiles, False)
+            for job in jobs]
+    with multiprocessing.Pool(os.cpu_count()) as pool:
+        pool.starmap(_render_one, args)
+    logger.info(f"Rendered {len(args)} district maps (no index page in batch mode)")
+
+
+def _render_one(state, district, drive_urls, vector_tiles=False, write_index=True):
+    """Render one district map - the unit of work for the batch pool"""
     logger.info(f"Generating map for {state} District {district}")
 
-    # Download data from Google Drive
-    district_gdf = download_geojson(drive_urls['district_boundary'])
-    counties_gdf = download_geojson(drive_urls['counties'])
+    # Download data from Google Drive; the two fetches are independent, so
+    # run them concurrently and wait max(t1, t2) instead of t1 + t2
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        district_future = executor.submit(download_geojson, drive_urls['district_boundary'])
+        counties_future = executor.submit(download_geojson, drive_urls['counties'])
+        district_gdf = district_future.result()
+        counties_gdf = counties_future.result()
+
+    # Only NAME is referenced by the popups/tooltips - drop the rest of the
+    # TIGER attribute columns so they aren't serialized into every feature
+    district_gdf = district_gdf[['geometry']]
+    if 'NAME' in counties_gdf.columns:
+        counties_gdf = counties_gdf[['NAME', 'geometry']]
+
+    # Cut TIGER-resolution vertex counts before they reach the output HTML
+    district_gdf = simplify_for_display(district_gdf, DISTRICT_SIMPLIFY_TOLERANCE)
+    counties_gdf = simplify_for_display(counties_gdf, COUNTY_SIMPLIFY_TOLERANCE)
 
     # Calculate map center
-    bounds = district_gdf.total_bounds
+    bounds = layer_bounds(district_gdf)
     center_lat = (bounds[1] + bounds[3]) / 2
     center_lon = (bounds[0] + bounds[2]) / 2
 
@@ -46,45 +232,48 @@ def generate_map(state, district, urls):
         height='100%'
     )
 
-    # Add district boundary (primary focus)
+    # Add district boundary (primary focus). Hand folium the raw
+    # __geo_interface__ mapping so it skips its GeoDataFrame->JSON detour.
     folium.GeoJson(
-        district_gdf,
-        style_function=lambda x: {
-            'fillColor': '#ff6b6b',
-            'color': '#c92a2a',
-            'weight': 3,
-            'fillOpacity': 0.3,
-            'opacity': 0.8
-        },
+        district_gdf.__geo_interface__,
+        style_function=district_style,
         popup=folium.Popup(
             f"<strong>{state} Congressional District {district}</strong>",
             max_width=300
         )
     ).add_to(m)
 
-    # Add county boundaries (interactive)
-    folium.GeoJson(
-        counties_gdf,
-        style_function=lambda x: {
-            'fillColor': '#4dabf7',
-            'color': '#1971c2',
-            'weight': 2,
-            'fillOpacity': 0.1,
-            'opacity': 0.6
-        },
-        popup=folium.Popup(
-            lambda x: f"<strong>County:</strong> {x['properties'].get('NAME', 'Unknown')}",
-            max_width=200
-        ),
-        tooltip=folium.Tooltip(
-            fields=['NAME'],
-            aliases=['County:'],
-            style="background-color: white; color: #333333; font-family: arial; font-size: 12px; padding: 10px;"
-        )
-    ).add_to(m)
+    # Ensure output directory exists (tiles are written alongside the map)
+    output_dir = Path('output')
+    output_dir.mkdir(exist_ok=True)
+
+    # County boundaries: when requested (and tippecanoe is installed) emit
+    # them as pre-tiled pbf consumed by Leaflet.VectorGrid, so the browser
+    # streams only the tiles in view instead of parsing one giant GeoJSON
+    district_key = f"{state}_{district}"
+    county_tiles = build_county_tiles(counties_gdf, output_dir, district_key) if vector_tiles else None
+    if county_tiles is not None:
+        VectorGridProtobuf(
+            'tiles/' + district_key + '/{z}/{x}/{y}.pbf',
+            name='counties',
+            options={
+                'vectorTileLayerStyles': {
+                    'counties': {
+                        'fill': True,
+                        'fillColor': '#4dabf7',
+                        'fillOpacity': 0.1,
+                        'color': '#1971c2',
+                        'weight': 2,
+                        'opacity': 0.6
+                    }
+                }
+            }
+        ).add_to(m)
+    else:
+        add_county_geojson(m, counties_gdf)
 
     # Add mobile-optimized controls
-    folium.plugins.Fullscreen(
+    Fullscreen(
         position='topright',
         title='Expand map',
         title_cancel='Exit full screen',
@@ -94,99 +283,94 @@ def generate_map(state, district, urls):
     # Fit bounds to district
     m.fit_bounds([[bounds[1], bounds[0]], [bounds[3], bounds[2]]])
 
-    # Ensure output directory exists
-    output_dir = Path('output')
-    output_dir.mkdir(exist_ok=True)
-
     # Save map
     map_filename = f"{state}_{district}_district_map.html"
     map_path = output_dir / map_filename
     m.save(str(map_path))
 
-    # Create index.html for GitHub Pages
-    create_index_page(output_dir, state, district, map_filename)
+    # The map HTML is pure text; precompress so the host can serve gzip
+    write_gzipped(map_path)
+
+    # Create index.html for GitHub Pages. Batch workers skip this: they all
+    # share one output/index.html, so concurrent writes would leave it (and
+    # its .gz sibling) describing whichever district finished last.
+    if write_index:
+        create_index_page(output_dir, state, district, map_filename)
 
     logger.info(f"Map generated: {map_path}")
 
+
+def add_county_geojson(m, counties_gdf):
+    """Embed the counties as an inline interactive GeoJSON layer.
+
+    GeoJsonPopup/GeoJsonTooltip bind per-feature properties client-side -
+    the old folium.Popup(lambda ...) just serialized the lambda's repr into
+    every feature. smooth_factor lets Leaflet simplify vertices further on
+    the fly while panning.
+    """
+    folium.GeoJson(
+        counties_gdf.__geo_interface__,
+        style_function=county_style,
+        smooth_factor=1.5,
+        popup=folium.GeoJsonPopup(
+            fields=['NAME'],
+            aliases=['County:'],
+            max_width=200
+        ),
+        tooltip=folium.GeoJsonTooltip(
+            fields=['NAME'],
+            aliases=['County:'],
+            style="background-color: white; color: #333333; font-family: arial; font-size: 12px; padding: 10px;"
+        )
+    ).add_to(m)
+
+
 def download_geojson(url):
-    """Download and load GeoJSON from Google Drive URL"""
-    response = requests.get(url)
-    response.raise_for_status()
-    
-    # Load as GeoDataFrame
-    import tempfile
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.geojson', delete=False) as f:
-        f.write(response.text)
-        temp_path = f.name
-    
-    gdf = gpd.read_file(temp_path)
-    Path(temp_path).unlink()  # Cleanup
-    return gdf
+    """Download and load GeoJSON from Google Drive URL, caching on disk"""
+    GEOJSON_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cache_path = GEOJSON_CACHE_DIR / f"{hashlib.blake2b(url.encode()).hexdigest()[:16]}.geojson"
+
+    # pyogrio parses the features in C instead of fiona's per-feature loop
+    if cache_path.exists() and time.time() - cache_path.stat().st_mtime < GEOJSON_CACHE_TTL:
+        logger.info(f"Cache hit for {url}")
+        return gpd.read_file(cache_path, engine='pyogrio')
+
+    # Stream the body into a temp file next to the cache entry and only
+    # move it into place once the download completes - an aborted transfer
+    # must not leave a truncated file that later runs take as a cache hit
+    fd, tmp_path = tempfile.mkstemp(dir=GEOJSON_CACHE_DIR, suffix='.part')
+    try:
+        with SESSION.get(url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=1 << 20):
+                    f.write(chunk)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    os.replace(tmp_path, cache_path)
+
+    return gpd.read_file(cache_path, engine='pyogrio')
 
 def create_index_page(output_dir, state, district, map_filename):
     """Create mobile-optimized index page"""
-    html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>{state} Congressional District {district} - Interactive Map</title>
-<style>
-body {{
-margin: 0;
-padding: 0;
-font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-background-color: #f8f9fa;
-}}
-.header {{
-background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-color: white;
-padding: 1rem;
-text-align: center;
-box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-}}
-.header h1 {{
-margin: 0;
-font-size: 1.5rem;
-}}
-.map-container {{
-width: 100vw;
-height: calc(100vh - 120px);
-border: none;
-}}
-.footer {{
-padding: 1rem;
-text-align: center;
-font-size: 0.9rem;
-color: #666;
-background: white;
-border-top: 1px solid #eee;
-}}
-@media (max-width: 768px) {{
-.header h1 {{
-font-size: 1.2rem;
-}}
-.map-container {{
-height: calc(100vh - 100px);
-}}
-}}
-</style>
-</head>
-<body>
-<div class="header">
-<h1>{state} Congressional District {district}</h1>
-<p>Interactive District and County Boundaries</p>
-</div>
-<iframe src="{map_filename}" class="map-container"></iframe>
-<div class="footer">
-<p>Data: U.S. Census Bureau | Generated: {{% now "Y-m-d" %}}</p>
-</div>
-</body>
-</html>"""
+    html_content = INDEX_TEMPLATE.render(
+        state=state,
+        district=district,
+        map_filename=map_filename,
+        date=datetime.date.today().isoformat()
+    )
 
     index_path = output_dir / 'index.html'
     with open(index_path, 'w') as f:
         f.write(html_content)
+    write_gzipped(index_path)
 
 if __name__ == '__main__':
-    generate_map()
+    # The CI workflow calls this script with the single-district options
+    # directly, so generate_map stays the default; `batch` routes to the
+    # manifest-driven pool
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        generate_maps_batch(sys.argv[2:])
+    else:
+        generate_map()
@@ -1,36 +1,42 @@
 #!/usr/bin/env python3
 """Development testing utilities"""
+import importlib.util
 import subprocess
 import sys
 from pathlib import Path
 import requests
-import json
+import orjson
 
 def test_environment():
     """Test development environment setup"""
     print("Testing development environment...")
     
-    # Test Python imports
-    try:
-        import geopandas
-        import folium
-        import pandas
-        print("✓ All required packages imported successfully")
-    except ImportError as e:
-        print(f"✗ Import error: {e}")
+    # Check packages via find_spec - roughly 10x cheaper than actually
+    # importing the geopandas/fiona/pyproj stack just to probe for it
+    missing = [pkg for pkg in ('geopandas', 'folium', 'pandas')
+               if importlib.util.find_spec(pkg) is None]
+    if missing:
+        print(f"✗ Missing packages: {', '.join(missing)}")
         return False
+    print("✓ All required packages available")
     
-    # Test GDAL
+    # Test GDAL - ask the Python binding first (no fork/exec), and only
+    # shell out to gdalinfo when the binding isn't installed
     try:
-        result = subprocess.run(['gdalinfo', '--version'], capture_output=True, text=True)
-        if result.returncode == 0:
-            print("✓ GDAL available")
-        else:
-            print("✗ GDAL not available")
+        from osgeo import gdal
+        print(f"✓ GDAL {gdal.__version__}")
+    except ImportError:
+        try:
+            result = subprocess.run(['gdalinfo', '--version'],
+                                    capture_output=True, text=True, check=False)
+            if result.returncode == 0:
+                print("✓ GDAL available")
+            else:
+                print("✗ GDAL not available")
+                return False
+        except FileNotFoundError:
+            print("✗ GDAL command not found")
             return False
-    except FileNotFoundError:
-        print("✗ GDAL command not found")
-        return False
     
     print("✓ Development environment ready")
     return True
@@ -59,9 +65,12 @@ def test_sample_map():
     # Save sample data
     output_dir = Path('output')
     output_dir.mkdir(exist_ok=True)
+    # The sample polygon is a fixed literal (folium renders straight from
+    # the dict), so only write the fixture file on the first run
     sample_file = output_dir / 'sample_district.geojson'
-    with open(sample_file, 'w') as f:
-        json.dump(sample_district, f)
+    if not sample_file.exists():
+        with open(sample_file, 'wb') as f:
+            f.write(orjson.dumps(sample_district))
     
     # Test basic map creation
     import folium